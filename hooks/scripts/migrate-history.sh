@@ -0,0 +1,23 @@
+#!/bin/bash
+# Convert a legacy .session-history.json (JSON array or {"sessions": [...]})
+# to the append-only .session-history.ndjson. One-time; a no-op afterwards.
+# Usage: migrate-history.sh <state_dir>
+set -euo pipefail
+
+STATE_DIR="$1"
+LEGACY_FILE="$STATE_DIR/.session-history.json"
+HISTORY_FILE="$STATE_DIR/.session-history.ndjson"
+
+[ -f "$LEGACY_FILE" ] || exit 0
+
+# Legacy sessions are oldest first; anything already appended to the NDJSON file is newer
+if jq -c 'if type == "array" then .[] else (.sessions // [])[] end' "$LEGACY_FILE" > "$HISTORY_FILE.tmp"; then
+  if [ -f "$HISTORY_FILE" ]; then
+    cat "$HISTORY_FILE" >> "$HISTORY_FILE.tmp"
+  fi
+  mv "$HISTORY_FILE.tmp" "$HISTORY_FILE"
+  mv "$LEGACY_FILE" "$LEGACY_FILE.bak"
+else
+  # Leave a corrupted legacy file in place for session-history.py to report
+  rm -f "$HISTORY_FILE.tmp"
+fi
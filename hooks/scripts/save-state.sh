@@ -63,23 +63,14 @@ if [ -f "$STATE_FILE" ]; then
   cp "$STATE_FILE" "$STATE_FILE.backup"
 fi
 
-# Update session history
-HISTORY_FILE="$STATE_DIR/.session-history.json"
+# Update session history (one JSON object per line, append-only)
+HISTORY_FILE="$STATE_DIR/.session-history.ndjson"
+bash "$(dirname "${BASH_SOURCE[0]}")/migrate-history.sh" "$STATE_DIR" || true
 CURRENT_PHASE=$(jq -r '.current_phase // "Unknown"' "$STATE_FILE")
 COMPLETION=$(jq -r '.completion_percentage // 0' "$STATE_FILE")
 EDITED_COUNT=$(jq '.last_edited_files | length' "$STATE_FILE")
 
-if [ ! -f "$HISTORY_FILE" ]; then
-  # Create new history file
-  cat > "$HISTORY_FILE" <<EOF
-{
-  "project_name": "$PROJECT_NAME",
-  "sessions": []
-}
-EOF
-fi
-
-# Append to history (keep last 30 sessions)
+# Append to history
 SESSION_ENTRY=$(cat <<EOF
 {
   "date": "$(date +%Y-%m-%d)",
@@ -92,8 +83,12 @@ SESSION_ENTRY=$(cat <<EOF
 EOF
 )
 
-jq ".sessions += [$SESSION_ENTRY] | .sessions |= if length > 30 then .[1:] else . end" \
-  "$HISTORY_FILE" > "$HISTORY_FILE.tmp" && mv "$HISTORY_FILE.tmp" "$HISTORY_FILE"
+echo "$SESSION_ENTRY" | jq -c '.' >> "$HISTORY_FILE"
+
+# Keep last 30 sessions; only rewrite once the file has doubled so appends stay cheap
+if [ "$(wc -l < "$HISTORY_FILE")" -gt 60 ]; then
+  tail -n 30 "$HISTORY_FILE" > "$HISTORY_FILE.tmp" && mv "$HISTORY_FILE.tmp" "$HISTORY_FILE"
+fi
 
 output_message "✓ Session state saved\n  Phase: $CURRENT_PHASE\n  Files: $EDITED_COUNT edited\n  Progress: ${COMPLETION}%"
 exit 0
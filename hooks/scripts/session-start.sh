@@ -10,6 +10,11 @@ STATE_FILE="$PROJECT_ROOT/.claude/.project-state.json"
 # Check if project has been indexed
 INDEX_FILE="$PROJECT_ROOT/.claude/.project-index.json"
 
+# Convert legacy session history so /resume sees it from the first session
+if [ -d "$PROJECT_ROOT/.claude" ]; then
+  bash "$(dirname "${BASH_SOURCE[0]}")/migrate-history.sh" "$PROJECT_ROOT/.claude" || true
+fi
+
 # Output structure for SessionStart hook
 output_message() {
   local message="$1"
@@ -12,9 +12,26 @@ Usage:
 import os
 import sys
 import json
+import re
 from pathlib import Path
+from itertools import islice
 from datetime import datetime, timezone
 
+# File extensions and ignored directories for file inference (the ignored
+# names match the directories generate-index.py prunes, including .venv)
+PHASE_EXTENSIONS = {".py", ".rs", ".go", ".js", ".md"}
+IGNORE_DIRS = {
+    ".git", "node_modules", "target", "venv", ".venv",
+    "__pycache__", "dist", "build", ".next", ".nuxt",
+    "vendor", "deps", "_build", "zig-cache", "zig-out"
+}
+
+# Markdown level-2 headers ("## Phase name")
+H2_RE = re.compile(r"^## (.*)$", re.MULTILINE)
+
+# Phase name to chunk ID slug: spaces become underscores, colons are dropped
+SLUG_TABLE = str.maketrans({" ": "_", ":": None})
+
 
 def detect_from_plan_file(project_root):
     """Extract phases from plan file if exists."""
@@ -36,16 +53,15 @@ def detect_from_plan_file(project_root):
         content = f.read()
 
     # Extract markdown headers (##)
-    for line in content.split("\n"):
-        if line.startswith("## "):
-            phase_name = line[3:].strip()
-            # Skip metadata sections
-            if not any(skip in phase_name.lower() for skip in ["summary", "timeline", "overview", "scope"]):
-                phases.append({
-                    "name": phase_name,
-                    "description": f"Phase extracted from plan: {plan_file.name}",
-                    "source": "plan_file"
-                })
+    for match in H2_RE.finditer(content):
+        phase_name = match.group(1).strip()
+        # Skip metadata sections
+        if not any(skip in phase_name.lower() for skip in ["summary", "timeline", "overview", "scope"]):
+            phases.append({
+                "name": phase_name,
+                "description": f"Phase extracted from plan: {plan_file.name}",
+                "source": "plan_file"
+            })
 
     return phases
 
@@ -84,9 +100,44 @@ def detect_from_directory_structure(project_root):
     return phases
 
 
+def walk_files(project_root, extensions, ignore_dirs, keyword_re):
+    """Lazily yield relative paths of matching files, pruning ignored directories.
+
+    Entries are visited in name order, each directory's files before its
+    subdirectories, so callers that stop early get the same files on
+    every filesystem.
+    """
+    root = str(Path(project_root).resolve())
+    prefix_len = len(root.rstrip(os.sep)) + 1
+
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue  # Skip directories we can't read
+
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in ignore_dirs:
+                    subdirs.append(entry.path)
+                continue
+
+            if os.path.splitext(entry.name)[1] not in extensions:
+                continue
+
+            # Check if file matches any keyword
+            if keyword_re.search(entry.path.lower()):
+                yield entry.path[prefix_len:]
+
+        # Reversed so the stack pops subdirectories in name order
+        stack.extend(reversed(subdirs))
+
+
 def infer_files_for_phase(project_root, phase):
     """Infer which files belong to a phase."""
-    project_path = Path(project_root).resolve()
     files = []
 
     # Keywords to match in file paths
@@ -110,20 +161,13 @@ def infer_files_for_phase(project_root, phase):
 
     # Scan project for matching files
     if keywords:
-        for pattern in ["**/*.py", "**/*.rs", "**/*.go", "**/*.js", "**/*.md"]:
-            for file_path in project_path.glob(pattern):
-                # Skip common ignore patterns
-                if any(ignore in str(file_path) for ignore in ["node_modules", "target", "venv", "__pycache__"]):
-                    continue
+        keyword_re = re.compile("|".join(re.escape(keyword) for keyword in keywords))
 
-                # Check if file matches any keyword
-                file_str = str(file_path).lower()
-                if any(keyword in file_str for keyword in keywords):
-                    relative = file_path.relative_to(project_path)
-                    files.append(str(relative))
+        # Limit to 50 files per phase; the walk stops once they are found
+        walker = walk_files(project_root, PHASE_EXTENSIONS, IGNORE_DIRS, keyword_re)
+        files.extend(islice(walker, 50))
 
-    # Limit to 50 files per phase
-    return files[:50]
+    return files
 
 
 def generate_chunks(project_root):
@@ -151,8 +195,9 @@ def generate_chunks(project_root):
 
     # Build chunks
     chunks = []
+    prev_chunk_id = None
     for i, phase in enumerate(phases, 1):
-        chunk_id = f"chunk_phase_{i}_{phase['name'].lower().replace(' ', '_').replace(':', '')}"
+        chunk_id = f"chunk_phase_{i}_{phase['name'].lower().translate(SLUG_TABLE)}"
 
         # Infer files for this phase
         files = infer_files_for_phase(project_root, phase)
@@ -161,10 +206,7 @@ def generate_chunks(project_root):
         entry_points = files[:2]
 
         # Dependencies (each phase depends on previous)
-        dependencies = []
-        if i > 1:
-            prev_chunk_id = f"chunk_phase_{i-1}_{phases[i-2]['name'].lower().replace(' ', '_').replace(':', '')}"
-            dependencies.append(prev_chunk_id)
+        dependencies = [prev_chunk_id] if prev_chunk_id else []
 
         chunks.append({
             "id": chunk_id,
@@ -176,6 +218,7 @@ def generate_chunks(project_root):
             "status": "pending",
             "completion": 0
         })
+        prev_chunk_id = chunk_id
 
     # Build final structure
     result = {
@@ -212,7 +255,8 @@ def main():
         chunks = generate_chunks(project_root)
 
         # Output JSON
-        print(json.dumps(chunks, indent=2))
+        json.dump(chunks, sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
         sys.exit(0)
 
@@ -9,9 +9,10 @@ Shows all imports/dependencies across files in the chunk, with analysis of:
 - Circular dependency detection
 
 Usage:
-    python extract-deps.py [chunk_id]
+    python extract-deps.py [chunk_id] [--strict]
     python extract-deps.py                 # Current chunk
     python extract-deps.py chunk_phase_2_api
+    python extract-deps.py --strict        # Parse Python files with ast
 """
 
 import os
@@ -20,7 +21,32 @@ import json
 import re
 import ast
 from pathlib import Path
+from functools import lru_cache
+from itertools import repeat
 from collections import defaultdict, Counter
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Python imports: "import a, b.c as d" (the whole statement, so prose such as
+# "import this is prose" in a docstring is skipped; names may continue onto the
+# next line after ", \") or "from .a.b import c"
+PY_IMPORT_RE = re.compile(
+    rb'(?m)^[ \t]*(?:'
+    rb'import[ \t]+((?:[A-Za-z_][\w.]*(?:[ \t]+as[ \t]+\w+)?[ \t]*,(?:[ \t]|\\\r?\n)*)*'
+    rb'[A-Za-z_][\w.]*(?:[ \t]+as[ \t]+\w+)?)[ \t]*(?:[;#\\]|\r?$)'
+    rb'|from[ \t]+\.*([A-Za-z_]\w*)[\w.]*[ \t]+import\b)'
+)
+
+# Rust: "use crate::a::b"
+RS_USE_RE = re.compile(rb'^\s*use\s+(crate|super|self)?::?([a-zA-Z0-9_:]+)')
+
+# Go: single imports and import blocks
+GO_SINGLE_RE = re.compile(rb'^\s*import\s+"([^"]+)"', re.MULTILINE)
+GO_BLOCK_RE = re.compile(rb'import\s*\((.*?)\)', re.DOTALL)
+GO_BLOCK_LINE_RE = re.compile(rb'^[ \t]*"([^"]+)"', re.MULTILINE)
+
+# JavaScript/TypeScript: ES imports and require()
+JS_IMPORT_RE = re.compile(rb'^\s*import\s+.*\s+from\s+[\'"]([^\'"]+)[\'"]')
+JS_REQUIRE_RE = re.compile(rb'require\([\'"]([^\'"]+)[\'"]\)')
 
 
 def load_chunks(chunks_file=".claude/.chunks.json"):
@@ -33,42 +59,66 @@ def load_chunks(chunks_file=".claude/.chunks.json"):
         return json.load(f)
 
 
-def get_chunk(chunks_data, chunk_id):
-    """Get specific chunk by ID."""
-    for chunk in chunks_data["chunks"]:
-        if chunk["id"] == chunk_id:
-            return chunk
-    return None
+def index_chunks(chunks_data):
+    """Build chunk-by-ID and file-to-chunk-ID lookup tables."""
+    chunks_by_id = {}
+    file_to_chunk = {}
 
+    # First occurrence wins, as with a linear scan
+    for chunk in chunks_data["chunks"]:
+        chunks_by_id.setdefault(chunk["id"], chunk)
+        for file in chunk["files"]:
+            file_to_chunk.setdefault(file, chunk["id"])
 
-def extract_python_imports(file_path):
-    """Extract imports from Python file."""
-    imports = []
+    return chunks_by_id, file_to_chunk
 
-    try:
-        with open(file_path) as f:
-            tree = ast.parse(f.read(), filename=file_path)
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append(alias.name.split('.')[0])
+def extract_python_imports(file_path, strict=False):
+    """Extract imports from Python file.
 
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    imports.append(node.module.split('.')[0])
+    Module names are pulled with a single regex scan. In strict mode the
+    file is parsed with ast instead, falling back to the scan on syntax errors.
 
-    except (SyntaxError, FileNotFoundError):
-        # Fallback to regex
+    The scan only sees statements at the start of a line with ASCII module
+    names, so it misses "import a; import b" (b), "if x: import q" and
+    non-ASCII (PEP 3131) names; use strict mode when those matter.
+    """
+    if strict:
         try:
             with open(file_path) as f:
-                for line in f:
-                    if match := re.match(r'^\s*import\s+([a-zA-Z0-9_]+)', line):
-                        imports.append(match.group(1))
-                    elif match := re.match(r'^\s*from\s+([a-zA-Z0-9_]+)', line):
-                        imports.append(match.group(1))
+                tree = ast.parse(f.read(), filename=file_path)
+        except SyntaxError:
+            pass  # Fallback to regex
         except FileNotFoundError:
-            pass
+            return []
+        else:
+            imports = []
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Import):
+                    for alias in node.names:
+                        imports.append(alias.name.split('.')[0])
+
+                elif isinstance(node, ast.ImportFrom):
+                    if node.module:
+                        imports.append(node.module.split('.')[0])
+
+            return imports
+
+    try:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+
+    imports = []
+    for match in PY_IMPORT_RE.finditer(data):
+        if match.group(1):
+            for name in match.group(1).split(b','):
+                parts = name.replace(b'\\', b' ').split()  # Drop line continuations
+                if parts:
+                    imports.append(parts[0].split(b'.')[0].decode('ascii'))
+        else:
+            imports.append(match.group(2).decode('ascii'))
 
     return imports
 
@@ -78,14 +128,14 @@ def extract_rust_uses(file_path):
     uses = []
 
     try:
-        with open(file_path) as f:
+        with open(file_path, 'rb') as f:
             for line in f:
-                if match := re.match(r'^\s*use\s+(crate|super|self)?::?([a-zA-Z0-9_:]+)', line):
-                    scope = match.group(1) or "external"
+                if match := RS_USE_RE.match(line):
+                    scope = match.group(1) or b"external"
                     path = match.group(2)
 
-                    if scope in ("crate", "super", "self"):
-                        uses.append(path.split("::")[0])
+                    if scope in (b"crate", b"super", b"self"):
+                        uses.append(path.split(b"::")[0].decode('ascii', 'ignore'))
     except FileNotFoundError:
         pass
 
@@ -97,21 +147,20 @@ def extract_go_imports(file_path):
     imports = []
 
     try:
-        with open(file_path) as f:
+        with open(file_path, 'rb') as f:
             content = f.read()
 
         # Single import
-        for match in re.finditer(r'^\s*import\s+"([^"]+)"', content, re.MULTILINE):
-            package = match.group(1).split('/')[-1]
-            imports.append(package)
+        for match in GO_SINGLE_RE.finditer(content):
+            package = match.group(1).split(b'/')[-1]
+            imports.append(package.decode('ascii', 'ignore'))
 
         # Import block
-        import_block = re.search(r'import\s*\((.*?)\)', content, re.DOTALL)
+        import_block = GO_BLOCK_RE.search(content)
         if import_block:
-            for line in import_block.group(1).split('\n'):
-                if match := re.match(r'^\s*"([^"]+)"', line):
-                    package = match.group(1).split('/')[-1]
-                    imports.append(package)
+            for match in GO_BLOCK_LINE_RE.finditer(import_block.group(1)):
+                package = match.group(1).split(b'/')[-1]
+                imports.append(package.decode('ascii', 'ignore'))
 
     except FileNotFoundError:
         pass
@@ -124,20 +173,20 @@ def extract_js_imports(file_path):
     imports = []
 
     try:
-        with open(file_path) as f:
+        with open(file_path, 'rb') as f:
             for line in f:
                 # import from
-                if match := re.match(r'^\s*import\s+.*\s+from\s+[\'"]([^\'"]+)[\'"]', line):
+                if match := JS_IMPORT_RE.match(line):
                     module = match.group(1)
                     # Get package name for node_modules
-                    if not module.startswith('.'):
-                        imports.append(module.split('/')[0])
+                    if not module.startswith(b'.'):
+                        imports.append(module.split(b'/')[0].decode('ascii', 'ignore'))
 
                 # require
-                elif match := re.match(r'require\([\'"]([^\'"]+)[\'"]\)', line):
+                elif match := JS_REQUIRE_RE.match(line):
                     module = match.group(1)
-                    if not module.startswith('.'):
-                        imports.append(module.split('/')[0])
+                    if not module.startswith(b'.'):
+                        imports.append(module.split(b'/')[0].decode('ascii', 'ignore'))
 
     except FileNotFoundError:
         pass
@@ -145,12 +194,13 @@ def extract_js_imports(file_path):
     return imports
 
 
-def extract_file_imports(file_path):
+@lru_cache(maxsize=None)
+def extract_file_imports(file_path, strict=False):
     """Extract imports based on file type."""
     ext = Path(file_path).suffix
 
     if ext == '.py':
-        return extract_python_imports(file_path)
+        return extract_python_imports(file_path, strict)
     elif ext == '.rs':
         return extract_rust_uses(file_path)
     elif ext == '.go':
@@ -161,6 +211,14 @@ def extract_file_imports(file_path):
         return []
 
 
+def list_dir(path):
+    """Return the set of entry names in a directory (empty if missing)."""
+    try:
+        return set(os.listdir(path))
+    except OSError:
+        return set()
+
+
 def categorize_imports(imports, project_root):
     """Categorize imports as internal or external."""
     internal = []
@@ -186,19 +244,17 @@ def categorize_imports(imports, project_root):
 
     stdlib_modules = python_stdlib | rust_stdlib | go_stdlib | js_builtins
 
+    # List candidate directories once instead of probing paths per import
+    root_entries = list_dir(project_root)
+    src_entries = list_dir(os.path.join(project_root, "src"))
+    lib_entries = list_dir(os.path.join(project_root, "lib"))
+
     for imp in imports:
         if imp in stdlib_modules:
             continue  # Skip standard library
 
         # Check if it exists in project
-        potential_paths = [
-            Path(project_root) / imp,
-            Path(project_root) / f"{imp}.py",
-            Path(project_root) / f"src/{imp}",
-            Path(project_root) / f"lib/{imp}",
-        ]
-
-        if any(p.exists() for p in potential_paths):
+        if imp in root_entries or f"{imp}.py" in root_entries or imp in src_entries or imp in lib_entries:
             internal.append(imp)
         else:
             external.append(imp)
@@ -206,28 +262,26 @@ def categorize_imports(imports, project_root):
     return internal, external
 
 
-def find_chunk_for_file(chunks_data, file_path):
-    """Find which chunk contains a file."""
-    for chunk in chunks_data["chunks"]:
-        if file_path in chunk["files"]:
-            return chunk["id"]
-    return None
+def main():
+    args = sys.argv[1:]
+    strict = "--strict" in args
+    if strict:
+        args.remove("--strict")
 
+    chunks_data = load_chunks()
+    chunks_by_id, file_to_chunk = index_chunks(chunks_data)
 
-def main():
     # Get chunk ID from args or use current
-    if len(sys.argv) > 1:
-        chunk_id = sys.argv[1]
+    if args:
+        chunk_id = args[0]
     else:
-        chunks_data = load_chunks()
         chunk_id = chunks_data.get("current_chunk")
         if not chunk_id:
             print("Error: No current chunk set", file=sys.stderr)
             sys.exit(1)
 
-    # Load chunks and get target chunk
-    chunks_data = load_chunks()
-    chunk = get_chunk(chunks_data, chunk_id)
+    # Get target chunk
+    chunk = chunks_by_id.get(chunk_id)
 
     if not chunk:
         print(f"Error: Chunk not found: {chunk_id}", file=sys.stderr)
@@ -237,12 +291,20 @@ def main():
     print("=" * 60)
     print()
 
-    # Extract imports from all files
+    # Extract imports from all files. The regex scans are I/O-bound and
+    # overlap well in threads; ast parsing holds the GIL, so use processes.
     all_imports = []
     file_imports = {}
 
-    for file in chunk["files"]:
-        imports = extract_file_imports(file)
+    if strict:
+        executor = ProcessPoolExecutor()
+    else:
+        executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4))
+
+    with executor:
+        results = list(executor.map(extract_file_imports, chunk["files"], repeat(strict)))
+
+    for file, imports in zip(chunk["files"], results):
         all_imports.extend(imports)
         if imports:
             file_imports[file] = imports
@@ -266,13 +328,11 @@ def main():
         for module, count in internal_counts.most_common():
             print(f"  • {module} ({count} imports)")
 
-            # Find which chunk this belongs to
-            potential_file = Path(project_root) / f"{module}.py"
-            if potential_file.exists():
-                dep_chunk_id = find_chunk_for_file(chunks_data, str(potential_file))
-                if dep_chunk_id and dep_chunk_id != chunk_id:
-                    dep_chunk = get_chunk(chunks_data, dep_chunk_id)
-                    print(f"    → Chunk: {dep_chunk['name']}")
+            # Find which chunk this belongs to (chunk files are project-relative)
+            dep_chunk_id = file_to_chunk.get(f"{module}.py")
+            if dep_chunk_id and dep_chunk_id != chunk_id:
+                dep_chunk = chunks_by_id[dep_chunk_id]
+                print(f"    → Chunk: {dep_chunk['name']}")
         print()
 
     # Print external dependencies
@@ -285,30 +345,20 @@ def main():
             print(f"  ... and {len(external_counts) - 10} more")
         print()
 
-    # Check cross-chunk dependencies
+    # Check cross-chunk dependencies. Candidate files are resolved against
+    # the chunk file map directly; a file no chunk lists can't add a dependency.
     cross_chunk_deps = set()
-    for file in chunk["files"]:
-        imports = extract_file_imports(file)
-        for imp in imports:
-            # Try to find file for import
-            potential_files = [
-                f"{imp}.py",
-                f"src/{imp}.py",
-                f"{imp}.rs",
-                f"src/{imp}.rs"
-            ]
-
-            for pf in potential_files:
-                if os.path.exists(pf):
-                    dep_chunk_id = find_chunk_for_file(chunks_data, pf)
-                    if dep_chunk_id and dep_chunk_id != chunk_id:
-                        cross_chunk_deps.add(dep_chunk_id)
+    for imp in set(all_imports):
+        for pf in (f"{imp}.py", f"src/{imp}.py", f"{imp}.rs", f"src/{imp}.rs"):
+            dep_chunk_id = file_to_chunk.get(pf)
+            if dep_chunk_id and dep_chunk_id != chunk_id:
+                cross_chunk_deps.add(dep_chunk_id)
 
     if cross_chunk_deps:
         print(f"Cross-Chunk Dependencies ({len(cross_chunk_deps)} chunks):")
         print("-" * 60)
         for dep_chunk_id in cross_chunk_deps:
-            dep_chunk = get_chunk(chunks_data, dep_chunk_id)
+            dep_chunk = chunks_by_id[dep_chunk_id]
             print(f"  • {dep_chunk['name']}")
             print(f"    ID: {dep_chunk_id}")
             print(f"    Status: {dep_chunk['status']}")
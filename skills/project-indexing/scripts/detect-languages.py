@@ -72,79 +72,61 @@ LANGUAGES = {
 GLOBAL_IGNORE = [".git", ".svn", ".hg", "__pycache__", ".pytest_cache", ".mypy_cache"]
 
 
-def should_ignore(path, language_config):
-    """Check if path should be ignored."""
-    path_str = str(path)
+# Lookup tables for the single-pass walk
+EXT_TO_LANG = {ext: lang for lang, config in LANGUAGES.items() for ext in config["extensions"]}
+MANIFEST_TO_LANG = {name: lang for lang, config in LANGUAGES.items() for name in config["manifests"]}
+ENTRY_TO_LANG = {name: lang for lang, config in LANGUAGES.items() for name in config["entry_patterns"]}
 
-    # Global ignores
-    for ignore in GLOBAL_IGNORE:
-        if f"/{ignore}/" in path_str or path_str.endswith(f"/{ignore}"):
-            return True
+# Directories never descended into, for any language
+IGNORE_DIRS = set(GLOBAL_IGNORE).union(*(config["ignore_dirs"] for config in LANGUAGES.values()))
 
-    # Language-specific ignores
-    for ignore in language_config["ignore_dirs"]:
-        if f"/{ignore}/" in path_str or path_str.endswith(f"/{ignore}"):
-            return True
 
-    return False
-
-
-def count_files_by_language(project_root):
-    """Count source files for each language."""
-    project_path = Path(project_root).resolve()
+def walk(project_root):
+    """Walk the project once, collecting file counts, manifests and entry points."""
+    root = str(Path(project_root).resolve())
+    prefix_len = len(root.rstrip(os.sep)) + 1
     counts = defaultdict(int)
-
-    for lang_name, lang_config in LANGUAGES.items():
-        for ext in lang_config["extensions"]:
-            for file_path in project_path.rglob(f"*{ext}"):
-                if not should_ignore(file_path, lang_config):
-                    counts[lang_name] += 1
-
-    return counts
-
-
-def find_manifests(project_root):
-    """Find package manager manifests for each language."""
-    project_path = Path(project_root).resolve()
     manifests = defaultdict(list)
+    entry_points = defaultdict(list)
 
-    for lang_name, lang_config in LANGUAGES.items():
-        for manifest_name in lang_config["manifests"]:
-            for manifest_path in project_path.rglob(manifest_name):
-                # Only top-level or service-level manifests, not nested in deps
-                if not should_ignore(manifest_path, lang_config):
-                    relative_path = manifest_path.relative_to(project_path)
-                    manifests[lang_name].append(str(relative_path))
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue  # Skip directories we can't read
 
-    return manifests
+        with entries:
+            for entry in entries:
+                name = entry.name
 
+                if entry.is_dir(follow_symlinks=False):
+                    if name not in IGNORE_DIRS:
+                        stack.append(entry.path)
+                    continue
 
-def find_entry_points(project_root):
-    """Find main entry point files for each language."""
-    project_path = Path(project_root).resolve()
-    entry_points = defaultdict(list)
+                lang = EXT_TO_LANG.get(os.path.splitext(name)[1])
+                if lang:
+                    counts[lang] += 1
+
+                lang = MANIFEST_TO_LANG.get(name)
+                if lang:
+                    manifests[lang].append(entry.path[prefix_len:])
 
-    for lang_name, lang_config in LANGUAGES.items():
-        for pattern in lang_config["entry_patterns"]:
-            for entry_path in project_path.rglob(pattern):
-                if not should_ignore(entry_path, lang_config):
-                    relative_path = entry_path.relative_to(project_path)
-                    entry_points[lang_name].append(str(relative_path))
+                lang = ENTRY_TO_LANG.get(name)
+                if lang:
+                    entry_points[lang].append(entry.path[prefix_len:])
 
-    return entry_points
+    # Report languages in LANGUAGES order, not walk order, so output and
+    # primary-language tie-breaking don't depend on the filesystem
+    counts = {lang: counts[lang] for lang in LANGUAGES if lang in counts}
+    return counts, manifests, entry_points
 
 
 def calculate_percentages(counts):
     """Calculate percentage for each language."""
-    total = sum(counts.values())
-    if total == 0:
-        return {}
-
-    percentages = {}
-    for lang, count in counts.items():
-        percentages[lang] = round((count / total) * 100, 1)
-
-    return percentages
+    total = sum(counts.values()) or 1
+    return {lang: round((count / total) * 100, 1) for lang, count in counts.items()}
 
 
 def determine_primary_language(counts, manifests, entry_points):
@@ -174,10 +156,8 @@ def determine_primary_language(counts, manifests, entry_points):
 
 def detect_languages(project_root):
     """Main language detection function."""
-    counts = count_files_by_language(project_root)
+    counts, manifests, entry_points = walk(project_root)
     percentages = calculate_percentages(counts)
-    manifests = find_manifests(project_root)
-    entry_points = find_entry_points(project_root)
     primary = determine_primary_language(counts, manifests, entry_points)
 
     # Build result
@@ -212,7 +192,8 @@ def main():
         languages = detect_languages(project_root)
 
         # Output JSON
-        print(json.dumps(languages, indent=2))
+        json.dump(languages, sys.stdout, indent=2)
+        sys.stdout.write("\n")
 
         # Exit with 0 if languages found, 1 if none
         sys.exit(0 if languages else 1)
@@ -5,22 +5,125 @@ Generate complete project index JSON from language detection and dependency scan
 Usage:
     python generate-index.py /path/to/project
     python generate-index.py  # Uses current directory
+    python generate-index.py /path/to/project --no-cache  # Ignore cached results
 
 This script orchestrates:
-1. Language detection (detect-languages.py)
-2. Dependency scanning (scan-dependencies.sh)
-3. Key file identification
-4. Structure analysis
-5. Git metadata extraction
-6. Final JSON generation
+1. Language detection (detect-languages.py, loaded in-process)
+2. Dependency scanning (scan-dependencies.sh, skipped while manifests are unchanged)
+3. Key file identification and structure analysis (one directory walk)
+4. Git metadata extraction
+5. Final JSON generation
 """
 
 import os
+import re
 import sys
 import json
+import mmap
+import heapq
+import hashlib
+import threading
 import subprocess
+import importlib.util
 from pathlib import Path
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Directories skipped when walking the project (reported as-is in the index)
+IGNORE_PATTERNS = [
+    ".git", "node_modules", "target", "venv", ".venv",
+    "__pycache__", "dist", "build", ".next", ".nuxt",
+    "vendor", "deps", "_build", "zig-cache", "zig-out"
+]
+
+# Constant-time membership test for the walk
+IGNORE_DIRS = frozenset(IGNORE_PATTERNS)
+
+# Key file patterns by category (glob syntax, relative to the project root)
+KEY_FILE_PATTERNS = {
+    # Entry points (language-specific patterns handled by detect-languages, add common ones here)
+    "entry_points": [
+        "**/main.*", "**/app.*", "**/server.*", "**/index.*",
+        "**/__main__.py", "**/manage.py"
+    ],
+    "configs": [
+        ".env.example", "config.yaml", "config/*.yaml", "*.config.js",
+        "docker-compose*.yml", "Caddyfile", "nginx.conf"
+    ],
+    "documentation": [
+        "README*", "CHANGELOG*", "CONTRIBUTING*", "LICENSE*",
+        "CLAUDE.md", "docs/**/*.md"
+    ],
+    # Test directories and files
+    "tests": ["tests", "test", "**/tests", "**/*_test.*", "**/test_*.*"],
+    "build": [
+        "Dockerfile*", "Makefile", ".github/workflows/*.yml",
+        ".gitlab-ci.yml", "build.sh", "deploy.sh"
+    ]
+}
+
+
+def glob_to_regex(pattern):
+    """Translate a glob to a regex source string over relative paths.
+
+    As with Path.glob, "*" and "?" stay within one path component and
+    "**/" matches zero or more directories.
+    """
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append(r"(?:[^/]*/)*")
+            i += 3
+            continue
+
+        char = pattern[i]
+        if char == "*":
+            regex.append(r"[^/]*")
+        elif char == "?":
+            regex.append(r"[^/]")
+        else:
+            regex.append(re.escape(char))
+        i += 1
+
+    return "".join(regex) + r"\Z"
+
+
+# One compiled alternation per category, built once at import
+CATEGORY_MATCHERS = {
+    category: re.compile("|".join(f"(?:{glob_to_regex(pattern)})" for pattern in patterns))
+    for category, patterns in KEY_FILE_PATTERNS.items()
+}
+
+# Cache files live in the repository's git directory, outside the work tree
+# that is walked and `git status`ed, so writing them never changes the index
+CACHE_DIR_NAME = "project-context"
+INDEX_CACHE_FILE = "project-index.cache.json"
+
+# Files whose stat metadata is part of the cache fingerprint, in addition to
+# the git branch, HEAD and status (covers manifests that are untracked or ignored).
+# These are also the only files scan-dependencies.sh reads.
+FINGERPRINT_FILES = [
+    "requirements.txt", "pyproject.toml", "Cargo.toml", "go.mod", "Project.toml",
+    "mix.exs", "CMakeLists.txt", "build.zig", "package.json"
+]
+
+# Dependency scan result, keyed by the manifest contents
+DEPENDENCY_CACHE_FILE = "dependencies.cache.json"
+
+# Serializes stderr messages from concurrently running stages
+LOG_LOCK = threading.Lock()
+
+
+def log(message):
+    """Print a progress or error message to stderr."""
+    with LOG_LOCK:
+        print(message, file=sys.stderr)
 
 
 def run_command(cmd, cwd=None):
@@ -35,176 +138,160 @@ def run_command(cmd, cwd=None):
         )
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
-        print(f"Error running {cmd[0]}: {e.stderr}", file=sys.stderr)
+        log(f"Error running {cmd[0]}: {e.stderr}")
         return None
 
 
-def detect_languages(project_root, script_dir):
-    """Run language detection script."""
-    script_path = script_dir / "detect-languages.py"
-    output = run_command(["python3", str(script_path), project_root])
+def load_sibling(name, path):
+    """Load a sibling script as a module (hyphenated file names can't be imported)."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
 
-    if output:
-        try:
-            return json.loads(output)
-        except json.JSONDecodeError as e:
-            print(f"Error parsing language detection output: {e}", file=sys.stderr)
-            return {}
-    return {}
+
+def detect_languages(project_root, script_dir):
+    """Run language detection in-process."""
+    try:
+        detector = load_sibling("detect_languages", script_dir / "detect-languages.py")
+        return detector.detect_languages(project_root)
+    except Exception as e:
+        log(f"Error detecting languages: {e}")
+        return {}
 
 
 def scan_dependencies(project_root, script_dir):
     """Run dependency scanning script."""
     script_path = script_dir / "scan-dependencies.sh"
+
+    # run_command reports a non-zero exit (with the script's stderr) and
+    # returns None, so only output from a successful run is parsed
     output = run_command(["bash", str(script_path), project_root])
+    if not output:
+        return {}
 
-    if output:
-        try:
-            deps = json.loads(output)
-            # Remove internal keys
-            deps.pop("_generated", None)
-            return deps
-        except json.JSONDecodeError as e:
-            print(f"Error parsing dependency scan output: {e}", file=sys.stderr)
-            return {}
-    return {}
-
-
-def find_key_files(project_root):
-    """Identify key project files."""
-    project_path = Path(project_root).resolve()
-    key_files = {
-        "entry_points": [],
-        "configs": [],
-        "documentation": [],
-        "tests": [],
-        "build": []
-    }
+    try:
+        deps = json.loads(output)
+    except json.JSONDecodeError as e:
+        log(f"Error parsing dependency scan output: {e}")
+        return {}
+
+    # Remove internal keys
+    deps.pop("_generated", None)
+    return deps
+
+
+def match_key_file(key_files, relative, entry):
+    """Record a directory entry under every key file category it matches."""
+    for category, matcher in CATEGORY_MATCHERS.items():
+        if not matcher.match(relative):
+            continue
+
+        if category == "tests":
+            if entry.is_dir():
+                key_files["tests"].append(relative + "/")
+            elif entry.is_file():
+                key_files["tests"].append(relative)
+        elif entry.is_file():
+            if category == "entry_points" and "test" in entry.path.lower():
+                continue
+            key_files[category].append(relative)
+
+
+def is_cargo_workspace(cargo_toml):
+    """Check whether a Cargo.toml declares a [workspace] table without reading it into memory."""
+    try:
+        with open(cargo_toml, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return m.find(b"[workspace]") != -1
+    except (OSError, ValueError):  # ValueError: an empty file cannot be mapped
+        return False
 
-    # Entry points (language-specific patterns handled by detect-languages, add common ones here)
-    entry_patterns = [
-        "**/main.*", "**/app.*", "**/server.*", "**/index.*",
-        "**/__main__.py", "**/manage.py"
-    ]
-    for pattern in entry_patterns:
-        for file_path in project_path.glob(pattern):
-            if file_path.is_file() and "test" not in str(file_path).lower():
-                relative = file_path.relative_to(project_path)
-                if str(relative) not in key_files["entry_points"]:
-                    key_files["entry_points"].append(str(relative))
-
-    # Configuration files
-    config_patterns = [
-        ".env.example", "config.yaml", "config/*.yaml", "*.config.js",
-        "docker-compose*.yml", "Caddyfile", "nginx.conf"
-    ]
-    for pattern in config_patterns:
-        for file_path in project_path.glob(pattern):
-            if file_path.is_file():
-                relative = file_path.relative_to(project_path)
-                key_files["configs"].append(str(relative))
-
-    # Documentation
-    doc_patterns = [
-        "README*", "CHANGELOG*", "CONTRIBUTING*", "LICENSE*",
-        "CLAUDE.md", "docs/**/*.md"
-    ]
-    for pattern in doc_patterns:
-        for file_path in project_path.glob(pattern):
-            if file_path.is_file():
-                relative = file_path.relative_to(project_path)
-                key_files["documentation"].append(str(relative))
 
-    # Test directories and files
-    test_patterns = ["tests", "test", "**/tests", "**/*_test.*", "**/test_*.*"]
-    for pattern in test_patterns:
-        for path in project_path.glob(pattern):
-            relative = path.relative_to(project_path)
-            if path.is_dir():
-                key_files["tests"].append(str(relative) + "/")
-            elif path.is_file():
-                key_files["tests"].append(str(relative))
-
-    # Build files
-    build_patterns = [
-        "Dockerfile*", "Makefile", ".github/workflows/*.yml",
-        ".gitlab-ci.yml", "build.sh", "deploy.sh"
-    ]
-    for pattern in build_patterns:
-        for file_path in project_path.glob(pattern):
-            if file_path.is_file():
-                relative = file_path.relative_to(project_path)
-                key_files["build"].append(str(relative))
+def detect_architecture(project_path, root_dirs, root_files):
+    """Determine architecture (simple heuristic).
+
+    root_files is the set of file names at the project root, collected by
+    the project walk, so marker files need no extra stat() calls.
+    """
+    root_dirs = set(root_dirs)
 
-    # Deduplicate and limit
-    for category in key_files:
-        key_files[category] = sorted(list(set(key_files[category])))[:20]
+    architecture = "monolith"
+    if "Cargo.toml" in root_files:
+        if is_cargo_workspace(project_path / "Cargo.toml"):
+            architecture = "monorepo"
+    elif "go.work" in root_files or "pnpm-workspace.yaml" in root_files:
+        architecture = "monorepo"
+    elif "services" in root_dirs or "packages" in root_dirs:
+        architecture = "monorepo"
+    elif "src" in root_dirs and "tests" in root_dirs and "lib" in root_dirs:
+        architecture = "library"
 
-    return key_files
+    return architecture
 
 
-def analyze_structure(project_root):
-    """Analyze project directory structure."""
-    project_path = Path(project_root).resolve()
+def scan_project(project_root):
+    """Walk the project once, identifying key files and analyzing structure.
 
-    # Ignore patterns
-    ignore_patterns = [
-        ".git", "node_modules", "target", "venv", ".venv",
-        "__pycache__", "dist", "build", ".next", ".nuxt",
-        "vendor", "deps", "_build", "zig-cache", "zig-out"
-    ]
+    Returns a (key_files, structure) tuple.
+    """
+    project_path = Path(project_root).resolve()
+    root = str(project_path)
+    prefix_len = len(root.rstrip(os.sep)) + 1
+    key_files = {category: [] for category in KEY_FILE_PATTERNS}
 
     # Count files and calculate size
     total_files = 0
     total_size_bytes = 0
     max_depth = 0
+    root_dirs = []
+    root_files = set()
 
-    for root, dirs, files in os.walk(project_path):
-        # Filter out ignored directories
-        dirs[:] = [d for d in dirs if d not in ignore_patterns]
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            entries = os.scandir(path)
+        except OSError:
+            continue  # Skip directories we can't read
 
-        # Calculate depth
-        depth = len(Path(root).relative_to(project_path).parts)
         max_depth = max(max_depth, depth)
 
-        # Count files and size
-        for file in files:
-            file_path = Path(root) / file
-            try:
-                total_files += 1
-                total_size_bytes += file_path.stat().st_size
-            except (OSError, PermissionError):
-                pass  # Skip files we can't access
-
-    total_size_mb = round(total_size_bytes / (1024 * 1024), 1)
-
-    # Get root directories
-    root_dirs = [d.name for d in project_path.iterdir() if d.is_dir() and d.name not in ignore_patterns]
-
-    # Determine architecture (simple heuristic)
-    architecture = "monolith"
-    if (project_path / "Cargo.toml").exists():
-        with open(project_path / "Cargo.toml") as f:
-            if "[workspace]" in f.read():
-                architecture = "monorepo"
-    elif (project_path / "go.work").exists():
-        architecture = "monorepo"
-    elif (project_path / "pnpm-workspace.yaml").exists():
-        architecture = "monorepo"
-    elif len([d for d in root_dirs if d == "services" or d == "packages"]) > 0:
-        architecture = "monorepo"
-    elif "src" in root_dirs and "tests" in root_dirs and ("lib" in root_dirs or (project_path / "Cargo.toml").exists()):
-        architecture = "library"
-
-    return {
-        "architecture": architecture,
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if entry.name in IGNORE_DIRS:
+                        continue
+                    if depth == 0:
+                        root_dirs.append(entry.name)
+                    # Symlinked directories are listed but not followed
+                    if not entry.is_symlink():
+                        stack.append((entry.path, depth + 1))
+                else:
+                    if depth == 0:
+                        root_files.add(entry.name)
+                    total_files += 1
+                    try:
+                        total_size_bytes += entry.stat().st_size
+                    except OSError:
+                        pass  # Skip files we can't access
+
+                match_key_file(key_files, entry.path[prefix_len:], entry)
+
+    # Deduplicate and keep the first 20 in sorted order without a full sort
+    for category, items in key_files.items():
+        key_files[category] = heapq.nsmallest(20, set(items))
+
+    structure = {
+        "architecture": detect_architecture(project_path, root_dirs, root_files),
         "root_dirs": sorted(root_dirs),
         "depth": max_depth,
         "total_files": total_files,
-        "total_size_mb": total_size_mb,
-        "ignored_dirs": ignore_patterns
+        "total_size_mb": round(total_size_bytes / (1024 * 1024), 1),
+        "ignored_dirs": IGNORE_PATTERNS
     }
 
+    return key_files, structure
+
 
 def get_git_metadata(project_root):
     """Extract git repository metadata."""
@@ -214,19 +301,27 @@ def get_git_metadata(project_root):
 
     metadata = {}
 
-    # Current branch
-    branch = run_command(["git", "branch", "--show-current"], cwd=project_root)
-    if branch:
-        metadata["branch"] = branch
-
-    # Check for changes
-    status = run_command(["git", "status", "--porcelain"], cwd=project_root)
-    metadata["has_changes"] = bool(status)
-
-    # Last commit
-    commit = run_command(["git", "rev-parse", "--short", "HEAD"], cwd=project_root)
-    if commit:
-        metadata["last_commit"] = commit
+    # Branch, HEAD commit and working tree changes
+    status = run_command(["git", "status", "--porcelain=v2", "--branch"], cwd=project_root)
+    if status is not None:
+        branch = commit = None
+        has_changes = False
+        for line in status.splitlines():
+            if line.startswith("# branch.head "):
+                branch = line[len("# branch.head "):]
+            elif line.startswith("# branch.oid "):
+                commit = line[len("# branch.oid "):]
+            elif not line.startswith("#"):
+                has_changes = True
+
+        if branch and branch != "(detached)":
+            metadata["branch"] = branch
+        metadata["has_changes"] = has_changes
+        if commit and commit != "(initial)":
+            # Let git pick the abbreviation: it honours core.abbrev and grows
+            # with the repository so the short hash stays unique
+            short = run_command(["git", "rev-parse", "--short", commit], cwd=project_root)
+            metadata["last_commit"] = short or commit[:7]
 
     # Remote URL
     remote = run_command(["git", "remote", "get-url", "origin"], cwd=project_root)
@@ -234,33 +329,180 @@ def get_git_metadata(project_root):
         metadata["remote"] = remote
 
     # Recent tags
-    tags = run_command(["git", "tag", "--sort=-creatordate"], cwd=project_root)
+    tags = run_command(
+        ["git", "for-each-ref", "--sort=-creatordate", "--count=5", "--format=%(refname:short)", "refs/tags"],
+        cwd=project_root
+    )
     if tags:
-        metadata["tags"] = tags.split("\n")[:5]  # Last 5 tags
+        metadata["tags"] = tags.split("\n")  # Last 5 tags
 
     return metadata
 
 
-def generate_index(project_root):
-    """Generate complete project index."""
-    project_path = Path(project_root).resolve()
-    script_dir = Path(__file__).parent
+def cache_dir(project_path):
+    """Return the cache directory inside the git directory, or None for non-git projects."""
+    if not (project_path / ".git").exists():
+        return None
 
-    # Gather all data
-    print("Detecting languages...", file=sys.stderr)
-    languages = detect_languages(str(project_path), script_dir)
+    git_dir = run_command(["git", "rev-parse", "--absolute-git-dir"], cwd=project_path)
+    if not git_dir:
+        return None
+    return Path(git_dir) / CACHE_DIR_NAME
 
-    print("Scanning dependencies...", file=sys.stderr)
-    dependencies = scan_dependencies(str(project_path), script_dir)
 
-    print("Identifying key files...", file=sys.stderr)
-    key_files = find_key_files(project_path)
+def compute_fingerprint(project_path, script_dir):
+    """Fingerprint the project state for the index cache.
 
-    print("Analyzing structure...", file=sys.stderr)
-    structure = analyze_structure(project_path)
+    Combines `git status --porcelain=v2 --branch` (branch, HEAD commit and
+    working tree changes, excluding .claude/) with the size/mtime of
+    manifests and of the indexing scripts themselves. Every untracked file
+    is listed, not just its top-level directory, so new files under an
+    untracked directory invalidate the cache. Gitignored files are not
+    covered; use --no-cache after changing only those.
+    Returns None for non-git projects, which are never cached.
+    """
+    if not (project_path / ".git").exists():
+        return None
 
-    print("Extracting git metadata...", file=sys.stderr)
-    git_metadata = get_git_metadata(project_path)
+    status = run_command(
+        ["git", "status", "--porcelain=v2", "--branch", "--untracked-files=all",
+         "--", ".", ":(exclude).claude"],
+        cwd=project_path
+    )
+    if status is None:
+        return None
+
+    digest = hashlib.sha1()
+    digest.update(status.encode())
+
+    stat_paths = [project_path / name for name in FINGERPRINT_FILES]
+    stat_paths += [Path(__file__), script_dir / "detect-languages.py", script_dir / "scan-dependencies.sh"]
+    for path in stat_paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        digest.update(f"\0{path}:{st.st_size}:{st.st_mtime_ns}".encode())
+
+    return digest.hexdigest()
+
+
+def load_cached_index(cache_file, fingerprint):
+    """Return the cached index if it was stored under this fingerprint."""
+    try:
+        with open(cache_file) as f:
+            cached = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+    if cached.get("fingerprint") != fingerprint:
+        return None
+    return cached.get("index")
+
+
+def dependencies_key(project_path, script_dir):
+    """Hash the manifests scan-dependencies.sh reads, plus the script itself."""
+    digest = hashlib.sha1()
+    for path in [project_path / name for name in FINGERPRINT_FILES] + [script_dir / "scan-dependencies.sh"]:
+        try:
+            with open(path, "rb") as f:
+                contents = f.read()
+        except OSError:
+            continue
+        digest.update(f"\0{path.name}:{len(contents)}\0".encode())
+        digest.update(contents)
+    return digest.hexdigest()
+
+
+def cached_stage(cache_file, key, compute, use_cache=True):
+    """Return a stage result stored under key, recomputing and storing it on a miss."""
+    if use_cache:
+        try:
+            with open(cache_file, "rb") as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return cached.get("value")
+        except (OSError, json.JSONDecodeError):
+            pass
+
+    value = compute()
+
+    # Empty results are also what a failed stage returns; don't pin those
+    if value:
+        try:
+            atomic_write_json(cache_file, {"key": key, "value": value})
+        except OSError as e:
+            log(f"Warning: could not write stage cache: {e}")
+
+    return value
+
+
+def json_dumps(data):
+    """Serialize to indented UTF-8 JSON bytes, using orjson when available."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode()
+
+
+def atomic_write_json(path, data):
+    """Write JSON to a temp file, then replace the target in one step."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(json_dumps(data))
+    os.replace(tmp_path, path)
+
+
+def generate_index(project_root, use_cache=True):
+    """Generate complete project index, reusing the cache when nothing changed."""
+    project_path = Path(project_root).resolve()
+    script_dir = Path(__file__).parent
+    cache_root = cache_dir(project_path)
+    cache_file = cache_root / INDEX_CACHE_FILE if cache_root else None
+
+    fingerprint = compute_fingerprint(project_path, script_dir) if cache_file else None
+    if use_cache and fingerprint:
+        cached = load_cached_index(cache_file, fingerprint)
+        if cached is not None:
+            log("Project unchanged, using cached index")
+            # The index is current as of now (staleness checks read indexed_at)
+            cached["indexed_at"] = datetime.now(timezone.utc).isoformat()
+            # Tags and the remote URL aren't part of the fingerprint; refresh them
+            git_metadata = get_git_metadata(project_path)
+            if git_metadata:
+                cached["git"] = git_metadata
+            else:
+                cached.pop("git", None)
+            return cached
+
+    # Gather all data. The stages are independent and mostly wait on
+    # subprocesses or directory I/O, so run them concurrently.
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        log("Detecting languages...")
+        languages = executor.submit(detect_languages, str(project_path), script_dir)
+
+        log("Scanning dependencies...")
+        if cache_root:
+            dependencies = executor.submit(
+                cached_stage,
+                cache_root / DEPENDENCY_CACHE_FILE,
+                dependencies_key(project_path, script_dir),
+                lambda: scan_dependencies(str(project_path), script_dir),
+                use_cache
+            )
+        else:
+            dependencies = executor.submit(scan_dependencies, str(project_path), script_dir)
+
+        log("Identifying key files and analyzing structure...")
+        project_scan = executor.submit(scan_project, project_path)
+
+        log("Extracting git metadata...")
+        git_metadata = executor.submit(get_git_metadata, project_path)
+
+    languages = languages.result()
+    dependencies = dependencies.result()
+    key_files, structure = project_scan.result()
+    git_metadata = git_metadata.result()
 
     # Build index
     index = {
@@ -277,14 +519,24 @@ def generate_index(project_root):
     if git_metadata:
         index["git"] = git_metadata
 
+    if fingerprint:
+        try:
+            atomic_write_json(cache_file, {"fingerprint": fingerprint, "index": index})
+        except OSError as e:
+            log(f"Warning: could not write index cache: {e}")
+
     return index
 
 
 def main():
     """CLI entry point."""
+    args = sys.argv[1:]
+    use_cache = "--no-cache" not in args
+    args = [arg for arg in args if arg != "--no-cache"]
+
     # Get project root from args or use current directory
-    if len(sys.argv) > 1:
-        project_root = sys.argv[1]
+    if args:
+        project_root = args[0]
     else:
         project_root = os.getcwd()
 
@@ -295,10 +547,12 @@ def main():
 
     # Generate index
     try:
-        index = generate_index(project_root)
+        index = generate_index(project_root, use_cache)
 
-        # Output JSON
-        print(json.dumps(index, indent=2))
+        # Output JSON as bytes, skipping the str round-trip through print()
+        sys.stdout.buffer.write(json_dumps(index))
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.flush()
 
         sys.exit(0)
 
@@ -14,7 +14,7 @@ set -euo pipefail
 
 PROJECT_ROOT="${PROJECT_ROOT:-.}"
 STATE_FILE="$PROJECT_ROOT/.claude/.project-state.json"
-HISTORY_FILE="$PROJECT_ROOT/.claude/.session-history.json"
+HISTORY_FILE="$PROJECT_ROOT/.claude/.session-history.ndjson"
 
 # Parse arguments
 LOAD_FILES=true
@@ -2,6 +2,10 @@
 """
 Query and manage session history.
 
+History is stored in .claude/.session-history.ndjson, one JSON object per
+line, so recording a session is a single append. A legacy
+.session-history.json file is migrated on first read.
+
 Usage:
     python session-history.py list [--limit N]
     python session-history.py show <session_id>
@@ -9,41 +13,100 @@ Usage:
     python session-history.py clean [--keep N]
 """
 
+import os
 import sys
 import json
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from collections import defaultdict
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def load_history(project_root="."):
-    """Load session history from file."""
-    history_file = Path(project_root) / ".claude" / ".session-history.json"
+# Append-only history, relative to the project root
+HISTORY_FILE = Path(".claude") / ".session-history.ndjson"
 
-    if not history_file.exists():
-        return []
+# Pre-NDJSON history (a JSON array, or {"sessions": [...]} as written by the Stop hook)
+LEGACY_HISTORY_FILE = Path(".claude") / ".session-history.json"
 
-    try:
-        with open(history_file) as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error: Session history file is corrupted: {e}", file=sys.stderr)
-        return []
 
+def json_loads(data):
+    """Parse JSON, using orjson when available."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
 
-def save_history(history, project_root="."):
-    """Save session history to file."""
-    history_file = Path(project_root) / ".claude" / ".session-history.json"
+
+def json_line(record):
+    """Serialize a record as one compact NDJSON line."""
+    if orjson:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False).encode() + b"\n"
+
+
+def atomic_write_history(history_file, sessions, tail=b""):
+    """Write sessions (then any raw NDJSON tail) to a temp file and replace the history in one step."""
     history_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = history_file.with_name(history_file.name + ".tmp")
+    with open(tmp_file, "wb") as f:
+        for session in sessions:
+            f.write(json_line(session))
+        f.write(tail)
+    os.replace(tmp_file, history_file)
+
+
+def migrate_legacy_history(project_root="."):
+    """Convert a legacy JSON history file to NDJSON (one-time)."""
+    legacy_file = Path(project_root) / LEGACY_HISTORY_FILE
+    if not legacy_file.exists():
+        return
+
+    try:
+        with open(legacy_file, "rb") as f:
+            legacy = json_loads(f.read())
+    except ValueError as e:
+        print(f"Error: Legacy session history file is corrupted: {e}", file=sys.stderr)
+        return
+
+    sessions = legacy.get("sessions", []) if isinstance(legacy, dict) else legacy
+
+    # Sessions appended to the NDJSON file already are newer than the legacy ones
+    history_file = Path(project_root) / HISTORY_FILE
+    appended = history_file.read_bytes() if history_file.exists() else b""
+
+    atomic_write_history(history_file, sessions, appended)
+
+    legacy_file.rename(legacy_file.with_suffix(".json.bak"))
+
+
+def iter_history(project_root="."):
+    """Yield session records from the history file, oldest first."""
+    migrate_legacy_history(project_root)
+
+    history_file = Path(project_root) / HISTORY_FILE
+    if not history_file.exists():
+        return
+
+    with open(history_file, "rb") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json_loads(line)
+            except ValueError as e:
+                print(f"Warning: Skipping corrupted session history line {line_number}: {e}", file=sys.stderr)
 
-    # Backup existing file
-    if history_file.exists():
-        backup_file = history_file.with_suffix(".json.bak")
-        history_file.rename(backup_file)
 
-    # Write new history
-    with open(history_file, "w") as f:
-        json.dump(history, f, indent=2)
+def load_history(project_root="."):
+    """Load session history from file."""
+    return list(iter_history(project_root))
+
+
+def save_history(history, project_root="."):
+    """Save session history to file."""
+    atomic_write_history(Path(project_root) / HISTORY_FILE, history)
 
 
 def format_duration(minutes):
@@ -57,16 +120,22 @@ def format_duration(minutes):
     return f"{hours}h {mins}m"
 
 
-def format_timestamp(iso_timestamp):
-    """Format ISO timestamp for display."""
-    dt = datetime.fromisoformat(iso_timestamp.replace("Z", "+00:00"))
+def parse_timestamp(iso_timestamp):
+    """Parse an ISO timestamp (with optional Z suffix) into a datetime."""
+    if iso_timestamp.endswith("Z"):
+        iso_timestamp = iso_timestamp[:-1] + "+00:00"
+    return datetime.fromisoformat(iso_timestamp)
+
+
+def format_timestamp(dt):
+    """Format a parsed timestamp for display."""
     return dt.strftime("%Y-%m-%d %H:%M")
 
 
-def calculate_age(iso_timestamp):
-    """Calculate age of session from timestamp."""
-    dt = datetime.fromisoformat(iso_timestamp.replace("Z", "+00:00"))
-    now = datetime.now(dt.tzinfo)
+def calculate_age(dt, now):
+    """Calculate age of session from its parsed timestamp, relative to now (UTC)."""
+    if dt.tzinfo is None:
+        now = now.astimezone().replace(tzinfo=None)  # Naive timestamps are local time
     delta = now - dt
 
     days = delta.days
@@ -96,6 +165,7 @@ def cmd_list(history, limit=None):
     print("═══════════════════════════════════════════════")
     print("")
 
+    now = datetime.now(timezone.utc)
     for session in sessions:
         session_id = session.get("session_id", "unknown")
         timestamp = session.get("timestamp", "")
@@ -105,8 +175,12 @@ def cmd_list(history, limit=None):
         files = session.get("edited_files_count", 0)
         todos = session.get("todos_completed", 0)
 
-        age = calculate_age(timestamp) if timestamp else "unknown"
-        time_str = format_timestamp(timestamp) if timestamp else "unknown"
+        if timestamp:
+            dt = parse_timestamp(timestamp)
+            age = calculate_age(dt, now)
+            time_str = format_timestamp(dt)
+        else:
+            age = time_str = "unknown"
 
         print(f"Session: {session_id}")
         print(f"  Time: {time_str} ({age})")
@@ -131,8 +205,8 @@ def cmd_show(history, session_id):
     print("")
 
     # Display all fields
-    timestamp = session.get("timestamp", "")
-    print(f"Timestamp: {format_timestamp(timestamp)} ({calculate_age(timestamp)})")
+    dt = parse_timestamp(session.get("timestamp", ""))
+    print(f"Timestamp: {format_timestamp(dt)} ({calculate_age(dt, datetime.now(timezone.utc))})")
     print(f"Duration: {format_duration(session.get('duration_minutes', 0))}")
     print("")
 
@@ -161,8 +235,30 @@ def cmd_show(history, session_id):
 
 
 def cmd_stats(history):
-    """Display statistics across all sessions."""
-    if not history:
+    """Display statistics across all sessions.
+
+    Aggregates in a single pass, so history may be any iterable of sessions
+    (e.g. the iter_history() stream).
+    """
+    total_sessions = 0
+    total_duration = 0
+    total_files = 0
+    total_todos = 0
+    total_commits = 0
+    phase_counts = defaultdict(int)
+    reason_counts = defaultdict(int)
+
+    for session in history:
+        get = session.get
+        total_sessions += 1
+        total_duration += get("duration_minutes", 0)
+        total_files += get("edited_files_count", 0)
+        total_todos += get("todos_completed", 0)
+        total_commits += get("commits_made", 0)
+        phase_counts[get("phase", "Unknown")] += 1
+        reason_counts[get("checkpoint_reason", "unknown")] += 1
+
+    if not total_sessions:
         print("No session history found.")
         return
 
@@ -171,15 +267,8 @@ def cmd_stats(history):
     print("═══════════════════════════════════════════════")
     print("")
 
-    # Calculate statistics
-    total_sessions = len(history)
-    total_duration = sum(s.get("duration_minutes", 0) for s in history)
-    total_files = sum(s.get("edited_files_count", 0) for s in history)
-    total_todos = sum(s.get("todos_completed", 0) for s in history)
-    total_commits = sum(s.get("commits_made", 0) for s in history)
-
-    avg_duration = total_duration / total_sessions if total_sessions > 0 else 0
-    avg_files = total_files / total_sessions if total_sessions > 0 else 0
+    avg_duration = total_duration / total_sessions
+    avg_files = total_files / total_sessions
 
     print(f"Total sessions: {total_sessions}")
     print(f"Total time: {format_duration(total_duration)}")
@@ -192,22 +281,12 @@ def cmd_stats(history):
     print("")
 
     # Phase breakdown
-    phase_counts = defaultdict(int)
-    for session in history:
-        phase = session.get("phase", "Unknown")
-        phase_counts[phase] += 1
-
     print("Sessions by phase:")
     for phase, count in sorted(phase_counts.items(), key=lambda x: -x[1]):
         print(f"  • {phase}: {count}")
     print("")
 
     # Checkpoint reasons
-    reason_counts = defaultdict(int)
-    for session in history:
-        reason = session.get("checkpoint_reason", "unknown")
-        reason_counts[reason] += 1
-
     print("Checkpoint reasons:")
     for reason, count in sorted(reason_counts.items(), key=lambda x: -x[1]):
         print(f"  • {reason}: {count}")
@@ -250,6 +329,11 @@ def main():
 
     command = sys.argv[1]
 
+    # Stats streams the history; every other command needs the full list
+    if command == "stats":
+        cmd_stats(iter_history())
+        return
+
     # Load history
     history = load_history()
 
@@ -267,9 +351,6 @@ def main():
         session_id = sys.argv[2]
         sys.exit(cmd_show(history, session_id))
 
-    elif command == "stats":
-        cmd_stats(history)
-
     elif command == "clean":
         keep = 30
         if len(sys.argv) > 2 and sys.argv[2] == "--keep":